@@ -0,0 +1,39 @@
+"""index payments on (sender_id, created_at, id) for keyset pagination
+
+Revision ID: 3a8c5f0e7b62
+Revises: e61a9f3b2d74
+Create Date: 2026-10-15 14:20:11.402519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3a8c5f0e7b62"
+down_revision: Union[str, Sequence[str], None] = "e61a9f3b2d74"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_payments_sender_created_at_id",
+        "payments",
+        ["sender_id", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_payments_sender_created_at", table_name="payments")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_payments_sender_created_at",
+        "payments",
+        ["sender_id", "created_at"],
+        unique=False,
+    )
+    op.drop_index("ix_payments_sender_created_at_id", table_name="payments")
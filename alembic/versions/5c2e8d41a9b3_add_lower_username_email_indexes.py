@@ -0,0 +1,41 @@
+"""add lower(username)/lower(email) indexes
+
+Revision ID: 5c2e8d41a9b3
+Revises: 07b199114faf
+Create Date: 2026-10-15 10:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c2e8d41a9b3"
+down_revision: Union[str, Sequence[str], None] = "07b199114faf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_users_lower_username",
+        "users",
+        [sa.text("lower(username)")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_users_lower_email",
+        "users",
+        [sa.text("lower(email)")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_lower_email", table_name="users")
+    op.drop_index("ix_users_lower_username", table_name="users")
@@ -0,0 +1,32 @@
+"""index payments on (sender_id, status, created_at, id)
+
+Revision ID: 7d2b9e4c1f35
+Revises: 3a8c5f0e7b62
+Create Date: 2026-10-15 15:02:37.118604
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2b9e4c1f35"
+down_revision: Union[str, Sequence[str], None] = "3a8c5f0e7b62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_payments_sender_status_created_at_id",
+        "payments",
+        ["sender_id", "status", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_payments_sender_status_created_at_id", table_name="payments")
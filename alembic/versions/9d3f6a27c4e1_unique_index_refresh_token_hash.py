@@ -0,0 +1,48 @@
+"""unique index on refresh_tokens.token_hash
+
+Revision ID: 9d3f6a27c4e1
+Revises: 5c2e8d41a9b3
+Create Date: 2026-10-15 11:02:17.540931
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d3f6a27c4e1"
+down_revision: Union[str, Sequence[str], None] = "5c2e8d41a9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        "refresh_tokens",
+        "token_hash",
+        existing_type=sa.String(),
+        type_=sa.String(length=64),
+        existing_nullable=False,
+    )
+    op.create_index(
+        op.f("ix_refresh_tokens_token_hash"),
+        "refresh_tokens",
+        ["token_hash"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_refresh_tokens_token_hash"), table_name="refresh_tokens")
+    op.alter_column(
+        "refresh_tokens",
+        "token_hash",
+        existing_type=sa.String(length=64),
+        type_=sa.String(),
+        existing_nullable=False,
+    )
@@ -0,0 +1,29 @@
+"""index on refresh_tokens.expires_at
+
+Revision ID: b4e7c1d95a08
+Revises: 9d3f6a27c4e1
+Create Date: 2026-10-15 12:14:05.318402
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e7c1d95a08"
+down_revision: Union[str, Sequence[str], None] = "9d3f6a27c4e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_refresh_tokens_expires_at"), "refresh_tokens", ["expires_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_refresh_tokens_expires_at"), table_name="refresh_tokens")
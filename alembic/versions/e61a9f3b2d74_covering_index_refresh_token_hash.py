@@ -0,0 +1,40 @@
+"""covering index on refresh_tokens.token_hash
+
+Revision ID: e61a9f3b2d74
+Revises: b4e7c1d95a08
+Create Date: 2026-10-15 13:05:42.907113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e61a9f3b2d74"
+down_revision: Union[str, Sequence[str], None] = "b4e7c1d95a08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f("ix_refresh_tokens_token_hash"), table_name="refresh_tokens")
+    op.create_index(
+        "ix_refresh_tokens_token_hash",
+        "refresh_tokens",
+        ["token_hash"],
+        unique=True,
+        postgresql_include=["user_id", "expires_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_refresh_tokens_token_hash", table_name="refresh_tokens")
+    op.create_index(
+        op.f("ix_refresh_tokens_token_hash"),
+        "refresh_tokens",
+        ["token_hash"],
+        unique=True,
+    )
@@ -0,0 +1,71 @@
+import uuid
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.core.config import get_settings
+
+# Shared between all workers, unlike the in-process caches. Stays None when
+# Redis is disabled, callers then fall back to their local behaviour.
+redis_client: Optional[Redis] = (
+    Redis(host=get_settings().REDIS_HOST, port=get_settings().REDIS_PORT)
+    if get_settings().REDIS_ENABLED
+    else None
+)
+
+
+async def close_redis() -> None:
+    """Close the Redis connection pool on application shutdown."""
+    if redis_client is not None:
+        await redis_client.aclose()
+
+
+def user_me_key(user_id: uuid.UUID) -> str:
+    return f"user:me:{user_id.hex}"
+
+
+def user_balance_key(user_id: uuid.UUID) -> str:
+    return f"user:balance:{user_id.hex}"
+
+
+def user_auth_key(user_id: uuid.UUID) -> str:
+    return f"user:auth:{user_id.hex}"
+
+
+def blocklist_key(jti: str) -> str:
+    return f"blocklist:{jti}"
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Return the cached value or None on a miss or when Redis is disabled."""
+    if redis_client is None:
+        return None
+    return await redis_client.get(key)
+
+
+async def cache_set(key: str, value: bytes, ttl: int) -> None:
+    if redis_client is not None:
+        await redis_client.set(key, value, ex=ttl)
+
+
+async def cache_exists(key: str) -> bool:
+    if redis_client is None:
+        return False
+    return await redis_client.exists(key) > 0
+
+
+async def cache_delete(*keys: str) -> None:
+    if redis_client is not None and keys:
+        await redis_client.delete(*keys)
+
+
+async def invalidate_user_cache(*user_ids: uuid.UUID) -> None:
+    """Drop cached user rows and /users/me responses after the rows changed."""
+    keys = []
+    for user_id in user_ids:
+        keys += [
+            user_me_key(user_id),
+            user_balance_key(user_id),
+            user_auth_key(user_id),
+        ]
+    await cache_delete(*keys)
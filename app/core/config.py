@@ -1,3 +1,7 @@
+import os
+from functools import cached_property, lru_cache
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,6 +11,12 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_REUSE_WINDOW_SECONDS: int = 10
+
+    # Passwords
+    BCRYPT_ROUNDS: int = 12
+    # Threads per worker process for bcrypt, which releases the GIL
+    PASSWORD_HASH_WORKERS: int = os.cpu_count() or 1
 
     # PostgreSQL
     POSTGRES_HOST: str = "postgres"
@@ -15,13 +25,38 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "test_password"
     POSTGRES_DB: str = "test_db"
 
+    # Connection pool of one worker process. The server can open up to
+    # SERVER_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections, which has
+    # to stay below Postgres max_connections (100 by default) with some room
+    # left for migrations and admin sessions.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 1024
+    DB_JIT: bool = False
+    DB_QUERY_CACHE_SIZE: int = 1200
+
+    # Server (uvicorn); every worker process has its own connection pool
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 2
+    SERVER_BACKLOG: int = 2048
+    # Connections and tasks per worker before answering 503, unlimited if unset
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None
+
     # Redis
+    REDIS_ENABLED: bool = False
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    USER_CACHE_TTL_SECONDS: int = 30
+
+    # Background tasks
+    EXPIRED_TOKENS_SWEEP_INTERVAL_SECONDS: int = 300
 
     model_config = SettingsConfigDict(env_file=".env")
 
-    @property
+    @cached_property
     def database_url(self):
         return (
             f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
@@ -29,4 +64,6 @@ class Settings(BaseSettings):
         )
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()
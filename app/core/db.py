@@ -1,17 +1,56 @@
 import sys
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
 
-from app.core.config import settings
+from app.core.config import get_settings
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(str(settings.database_url), echo=False, future=True)
+def make_engine(
+    url: Optional[str] = None, poolclass: type[Pool] = AsyncAdaptedQueuePool
+) -> AsyncEngine:
+    """
+    Create the application engine. Tests pass NullPool; pool sizing applies
+    only to the default queue pool.
+    """
+    settings = get_settings()
+    pool_args = {}
+    if issubclass(poolclass, AsyncAdaptedQueuePool):
+        pool_args = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+    return create_async_engine(
+        url or str(settings.database_url),
+        echo=False,
+        future=True,
+        poolclass=poolclass,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args={
+            # asyncpg's own prepared statement cache and SQLAlchemy's adapter cache
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            # JIT compilation only slows down the short OLTP queries of this service
+            "server_settings": {"jit": "on" if settings.DB_JIT else "off"},
+        },
+        **pool_args,
+    )
+
+
+engine = make_engine()
 async_session_maker = async_sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
 )
@@ -23,6 +62,11 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Session factory for work that outlives the request, e.g. streamed bodies."""
+    return async_session_maker
+
+
 if "alembic" in sys.modules:
     from app.models import (
         models,  # noqa: F401
@@ -1,46 +1,109 @@
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+import orjson
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import (
+    blocklist_key,
+    cache_exists,
+    cache_get,
+    cache_set,
+    user_auth_key,
+)
+from app.core.config import get_settings
 from app.core.db import get_async_session
 from app.core.jwt import decode_access_token
 from app.models.models import User
 
-security = HTTPBearer()
+# Module-level schemes: FastAPI builds the dependency tree once per route and
+# reuses these instances for every request.
+security = HTTPBearer(auto_error=True)
+optional_security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
+async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security),  # noqa: B008 для FastAPI это нормальная реализация
-    db: AsyncSession = Depends(get_async_session),
-) -> User:
-    """Decode access token and return the User model instance from DB."""
+) -> uuid.UUID:
+    """Decode access token and return the user id without touching the DB."""
     token = credentials.credentials
-    payload = decode_access_token(token)
+    # "sub" and "exp" are required claims, so the payload is complete here
+    payload = await decode_access_token(token)
+    user_id = payload["sub"]
 
-    user_id = payload.get("sub", None)
-
-    if user_id is None:
+    if await check_blocklist(payload.get("jti")):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token payload"
-        ) from None
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked"
+        )
 
-    # token stores user id as string (uuid). Convert to UUID and load user.
+    # token stores user id as 32-char hex. Convert to UUID.
     try:
-        import uuid as _uuid
-
-        user_uuid = _uuid.UUID(user_id)
+        return uuid.UUID(hex=user_id)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token subject"
         ) from None
 
-    user = await db.get(User, user_uuid)
+
+def _user_to_cache(user: User) -> bytes:
+    # hashed_password is left out, authentication never reads it from here
+    return orjson.dumps(
+        {
+            "id": user.id.hex,
+            "email": user.email,
+            "username": user.username,
+            "is_active": user.is_active,
+            "is_verified_email": user.is_verified_email,
+            "balance": str(user.balance),
+            "created_at": user.created_at.isoformat(),
+        }
+    )
+
+
+async def _user_from_cache(db: AsyncSession, raw: bytes) -> User:
+    data = orjson.loads(raw)
+    user = User(
+        id=uuid.UUID(hex=data["id"]),
+        email=data["email"],
+        username=data["username"],
+        is_active=data["is_active"],
+        is_verified_email=data["is_verified_email"],
+        balance=Decimal(data["balance"]),
+        created_at=datetime.fromisoformat(data["created_at"]),
+    )
+    # Attach as an already persisted row without a SELECT, so later UPDATEs
+    # with populate_existing refresh this same instance
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+async def get_current_user(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_session),
+) -> User:
+    """
+    Return the User model instance of the token owner. The row is cached in
+    Redis for a short time and dropped by invalidate_user_cache on changes.
+    """
+    key = user_auth_key(user_id)
+    cached = await cache_get(key)
+    if cached is not None:
+        return await _user_from_cache(db, cached)
+
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
         ) from None
 
+    await cache_set(key, _user_to_cache(user), get_settings().USER_CACHE_TTL_SECONDS)
     return user
 
 
@@ -57,40 +120,35 @@ async def get_current_active_user(
     return current_user
 
 
-# async def add_jti_to_blocklist(jti: str, exp_time: datetime):
-#     """Add a JWT ID to the blocklist."""
-#     now = datetime.now(timezone.utc)
-#     ttl = round((exp_time - now).total_seconds())
-#     if ttl > 0:
-#         await redis_client.setex(jti, ttl, "blocked")
+@dataclass(slots=True)
+class RequestContext:
+    """DB session and authenticated user of the current request."""
+
+    session: AsyncSession
+    user: User
 
 
-# async def check_blocklist(jti: str) -> bool:
-#     """Check if a JWT ID is in the blocklist."""
-#     return await redis_client.get(jti) is not None
+async def get_request_context(
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> RequestContext:
+    """
+    Single dependency for endpoints that need both the session and the user.
+    get_current_user resolves get_async_session itself, FastAPI's per-request
+    cache hands the same session to both.
+    """
+    return RequestContext(session=session, user=user)
 
 
-async def find_uniquiness_conflicts(
-    db: AsyncSession, username: str, email: str
-) -> dict[str, str]:
-    """Check if the username, email, or phone already exists in the database."""
+async def add_jti_to_blocklist(jti: str, exp: int):
+    """Add a JWT ID to the blocklist until the token expires."""
+    ttl = round(exp - time.time())
+    if ttl > 0:
+        await cache_set(blocklist_key(jti), b"blocked", ttl)
 
-    query = (
-        select(User.username, User.email)
-        .where(
-            or_(
-                func.lower(User.username) == func.lower(username),
-                func.lower(User.email) == func.lower(email),
-            )
-        )
-        .limit(5)
-    )
 
-    rows = (await db.execute(query)).all()
-    problems: dict[str, str] = {}
-    for n, e in rows:
-        if n.lower() == username.lower():
-            problems["username"] = "уже занят"
-        if e == email:
-            problems["email"] = "уже занята"
-    return problems
+async def check_blocklist(jti: Optional[str]) -> bool:
+    """Check if a JWT ID is in the blocklist."""
+    if jti is None:
+        return False
+    return await cache_exists(blocklist_key(jti))
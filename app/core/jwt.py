@@ -1,46 +1,85 @@
+import base64
+import binascii
 import hashlib
 import secrets
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import jwt
+import orjson
+from cachetools import TTLCache
 from fastapi import HTTPException, status
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
+from app.core.cache import (
+    blocklist_key,
+    cache_delete,
+    cache_exists,
+    cache_get,
+    cache_set,
+)
+from app.core.config import get_settings
 from app.models.models import User
 from app.models.token import RefreshToken
 from app.schemas.auth import TokensPair
 
+# Signing/decoding parameters are resolved once instead of on every request
+_KEY = get_settings().SECRET_KEY
+_ALG = get_settings().ALGORITHM
+_ALGS = [_ALG]
+_ACCESS_TOKEN_TTL = int(
+    timedelta(minutes=get_settings().ACCESS_TOKEN_EXPIRE_MINUTES).total_seconds()
+)
+_jws = jwt.PyJWS()
+_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+
+# Verified access token payloads keyed by a short hash of the raw token.
+# Saves the signature check and JSON parsing for tokens reused within the TTL.
+# The in-process cache is backed by Redis (when enabled) shared by all workers.
+_PAYLOAD_CACHE_TTL = 30
+_payload_cache: TTLCache = TTLCache(maxsize=10_000, ttl=_PAYLOAD_CACHE_TTL)
+
+
+def _hash_token_bytes(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=32).hexdigest()
+
 
 def get_token_hash(token: str) -> str:
-    """Generate a hash for the given token."""
-    return hashlib.sha256(token.encode()).hexdigest()
+    """Generate a hash for the given refresh token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except binascii.Error:
+        # Not one of ours, hash it as is so the lookup simply finds nothing
+        raw = token.encode()
+    return _hash_token_bytes(raw)
 
 
 def create_access_token(user_id: uuid.UUID) -> str:
     """Create a new access token."""
 
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    )
     jwt_id = secrets.token_urlsafe(16)  # Unique identifier for the JWT
 
-    to_encode = {"sub": str(user_id), "exp": expire, "jti": jwt_id}
+    to_encode = {
+        "sub": user_id.hex,
+        "exp": int(time.time()) + _ACCESS_TOKEN_TTL,
+        "jti": jwt_id,
+    }
+
+    # Claims are plain JSON types, so orjson can serialize them and PyJWS only
+    # has to sign, skipping PyJWT's claim conversion and stdlib json.dumps
+    return _jws.encode(orjson.dumps(to_encode), _KEY, algorithm=_ALG)
 
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
 
-    return encoded_jwt
+def _payload_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
 
 
-def decode_access_token(token: str):
+def _verify_access_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=settings.ALGORITHM)
-        return payload
+        return jwt.decode(token, _KEY, algorithms=_ALGS, options=_DECODE_OPTIONS)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired"
@@ -52,44 +91,91 @@ def decode_access_token(token: str):
         ) from None
 
 
+def _outlives_cache(payload: dict) -> bool:
+    # Cache only tokens that outlive the cache entry, so expiry is never missed
+    return payload["exp"] - time.time() > _PAYLOAD_CACHE_TTL
+
+
+async def decode_access_token(token: str) -> dict:
+    cache_key = _payload_cache_key(token)
+    payload = _payload_cache.get(cache_key)
+    if payload is not None:
+        return payload
+
+    redis_key = f"jwt:{cache_key.hex()}"
+    cached = await cache_get(redis_key)
+    if cached is not None:
+        payload = orjson.loads(cached)
+        if _outlives_cache(payload):
+            _payload_cache[cache_key] = payload
+        return payload
+
+    payload = _verify_access_token(token)
+
+    if _outlives_cache(payload):
+        _payload_cache[cache_key] = payload
+        await cache_set(redis_key, orjson.dumps(payload), _PAYLOAD_CACHE_TTL)
+
+    return payload
+
+
 async def create_refresh_token(db: AsyncSession, user_id: uuid.UUID):
     """Create a new refresh token."""
-    token = secrets.token_urlsafe(64)
-    token_hash = get_token_hash(token)
+    raw = secrets.token_bytes(48)
+    token = base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+    token_hash = _hash_token_bytes(raw)
 
     expires_at = datetime.now(timezone.utc) + timedelta(
-        days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+        days=get_settings().REFRESH_TOKEN_EXPIRE_DAYS
     )
 
-    #  т.е. мы подготавливаем данные к записи в бд, но не КОММИТИМ их
-    new_refresh_token = RefreshToken(
-        user_id=user_id, token_hash=token_hash, expires_at=expires_at
+    #  т.е. мы подготавливаем данные к записи в бд, но не КОММИТИМ их.
+    #  Объект ORM не нужен: обычный INSERT без flush и без RETURNING id
+    await db.execute(
+        insert(RefreshToken).values(
+            user_id=user_id, token_hash=token_hash, expires_at=expires_at
+        )
     )
-    db.add(new_refresh_token)
-    await db.flush()
 
     # возвращаем нехэшированный токен для передачи пользователю
     return token
 
 
-async def delete_refresh_token(db: AsyncSession, token: RefreshToken):
-    """Delete a refresh token from the database."""
-    await db.delete(token)
+async def delete_used_refresh_token(db: AsyncSession, token: RefreshToken):
+    """Delete a used refresh token."""
+    await db.execute(delete(RefreshToken).where(RefreshToken.id == token.id))
+
 
+def _refresh_reuse_key(token: str) -> str:
+    return f"refresh:{get_token_hash(token)}"
 
-async def delete_expired_refresh_tokens_for_user(db: AsyncSession, user_id: uuid.UUID):
-    """Remove expired refresh tokens from the database for a specific user."""
-    query = delete(RefreshToken).where(
-        RefreshToken.user_id == user_id,
-        RefreshToken.expires_at < datetime.now(timezone.utc),
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
+    """Delete the given refresh token, if it exists, e.g. on logout."""
+    await db.execute(
+        delete(RefreshToken).where(RefreshToken.token_hash == get_token_hash(token))
     )
-    await db.execute(query)
+    await db.commit()
+    await cache_delete(_refresh_reuse_key(token))
+
+
+async def delete_expired_refresh_tokens(db: AsyncSession) -> int:
+    """Delete expired refresh tokens of all users, return the number of rows."""
+    result = await db.execute(
+        delete(RefreshToken).where(RefreshToken.expires_at < datetime.now(timezone.utc))
+    )
+    return result.rowcount
 
 
 async def get_refresh_token(db: AsyncSession, token: str) -> Optional[RefreshToken]:
-    """Get a refresh token from the database."""
+    """Get a refresh token of an existing user from the database."""
     token_hash = get_token_hash(token)
-    query = select(RefreshToken).where(RefreshToken.token_hash == token_hash)
+    # The join checks that the owner still exists in the same round-trip
+    query = (
+        select(RefreshToken)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == token_hash)
+    )
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
@@ -113,6 +199,18 @@ async def create_token_pair(db: AsyncSession, user_id: uuid.UUID) -> TokensPair:
 async def update_tokens_pair(db: AsyncSession, incoming_token: str):
     """Update the access and refresh token pair."""
 
+    # A client retrying the same refresh (e.g. after a dropped response) gets
+    # the access token issued a moment ago instead of a 401 for the rotated
+    # token. The new refresh token is never handed out again (the rotated one
+    # is echoed back), and neither is an access token blocklisted by a logout.
+    reuse_key = _refresh_reuse_key(incoming_token)
+    cached = await cache_get(reuse_key)
+    if cached is not None:
+        access_token = cached.decode()
+        payload = await decode_access_token(access_token)
+        if not await cache_exists(blocklist_key(payload["jti"])):
+            return TokensPair(access_token=access_token, refresh_token=incoming_token)
+
     token = await get_refresh_token(db, incoming_token)
 
     if token is None:
@@ -124,27 +222,25 @@ async def update_tokens_pair(db: AsyncSession, incoming_token: str):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has expired"
         )
 
-    user: User | None = await db.get(User, token.user_id)
-
-    if user:
-        try:
-            await delete_refresh_token(db, token)
-
-            await delete_expired_refresh_tokens_for_user(db, user.id)
+    try:
+        await delete_used_refresh_token(db, token)
 
-            new_access_token = create_access_token(user.id)
-            new_refresh_token = await create_refresh_token(db, user.id)
+        new_access_token = create_access_token(token.user_id)
+        new_refresh_token = await create_refresh_token(db, token.user_id)
 
-            await db.commit()
+        await db.commit()
 
-            return TokensPair(
-                access_token=new_access_token, refresh_token=new_refresh_token
-            )
+    except Exception as e:
+        await db.rollback()
 
-        except Exception as e:
-            await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Could not process token rotation. Details: {e}",
+        ) from e
 
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Could not process token rotation. Details: {e}",
-            ) from e
+    await cache_set(
+        reuse_key,
+        new_access_token.encode(),
+        get_settings().REFRESH_TOKEN_REUSE_WINDOW_SECONDS,
+    )
+    return TokensPair(access_token=new_access_token, refresh_token=new_refresh_token)
@@ -1,13 +1,41 @@
-from passlib.context import CryptContext
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import bcrypt
 
+from app.core.config import get_settings
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# bcrypt is CPU-bound but releases the GIL, so hashing in a dedicated pool runs
+# in parallel and does not block the event loop during login bursts.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=get_settings().PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+
+
+def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+
+
+def _hash_password_sync(plain_password: str) -> str:
+    salt = bcrypt.gensalt(rounds=get_settings().BCRYPT_ROUNDS)
+    return bcrypt.hashpw(plain_password.encode(), salt).decode()
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_pool, _verify_password_sync, plain_password, hashed_password
+    )
 
 
-def hash_password(plain_password: str) -> str:
+async def hash_password(plain_password: str) -> str:
     """Hash a plain password."""
-    return pwd_context.hash(plain_password)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, _hash_password_sync, plain_password)
+
+
+def shutdown_hash_pool() -> None:
+    """Stop the hashing threads on application shutdown."""
+    _hash_pool.shutdown(wait=False, cancel_futures=True)
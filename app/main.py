@@ -1,22 +1,50 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from logging.config import dictConfig
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app import all_models  # noqa: F401
+from app.core.cache import close_redis
+from app.core.config import get_settings
+from app.core.db import async_session_maker
+from app.core.jwt import delete_expired_refresh_tokens
+from app.core.security import shutdown_hash_pool
 from app.routers import auth, payments, users
+from app.utils.dependency_cache import install_dependency_inspection_cache
 from app.utils.lg import logging_config
 
 dictConfig(logging_config)
+install_dependency_inspection_cache()
 logger = logging.getLogger(__name__)
 
 
+async def _sweep_expired_tokens():
+    """Periodically delete expired refresh tokens instead of doing it per refresh."""
+    while True:
+        await asyncio.sleep(get_settings().EXPIRED_TOKENS_SWEEP_INTERVAL_SECONDS)
+        try:
+            async with async_session_maker() as session:
+                deleted = await delete_expired_refresh_tokens(session)
+                await session.commit()
+            logger.info("Deleted %s expired refresh tokens", deleted)
+        except Exception:
+            logger.exception("Expired refresh tokens sweep failed")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Application startup...")
+    sweep_task = asyncio.create_task(_sweep_expired_tokens())
     yield
+    sweep_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await sweep_task
+    await close_redis()
+    shutdown_hash_pool()
     logger.info("Application shutdown...")
 
 
@@ -26,6 +54,7 @@ app = FastAPI(
     version="0.0.1",
     root_path="/api",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -51,4 +80,15 @@ async def health_check():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("main:app", reload=True)
+    settings = get_settings()
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.SERVER_WORKERS,
+        backlog=settings.SERVER_BACKLOG,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+    )
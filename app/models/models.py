@@ -83,20 +83,17 @@ class User(Base):
         back_populates="sender",
         foreign_keys="[Payment.sender_id]",
         cascade="all, delete-orphan",
-        lazy="selectin",
     )
     payments_received: Mapped[List["Payment"]] = relationship(
         "Payment",
         back_populates="recipient",
         foreign_keys="[Payment.recipient_id]",
         cascade="all, delete-orphan",
-        lazy="selectin",
     )
     performed_logs: Mapped[List["PaymentLog"]] = relationship(
         "PaymentLog",
         back_populates="performed_by_user",
         foreign_keys="[PaymentLog.performed_by]",
-        lazy="selectin",
     )
 
     verification_codes: Mapped[list["VerificationCode"]] = relationship(
@@ -107,6 +104,12 @@ class User(Base):
         "RefreshToken", back_populates="user"
     )
 
+    __table_args__ = (
+        # Поиск конфликтов уникальности идёт по lower(username)/lower(email)
+        Index("ix_users_lower_username", text("lower(username)")),
+        Index("ix_users_lower_email", text("lower(email)")),
+    )
+
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email={self.email})>"
 
@@ -173,25 +176,25 @@ class Payment(Base):
         Integer, nullable=False, server_default=text("1"), default=1
     )
 
-    # Отношения
+    # Отношения. PaymentRead их не сериализует; случайная ленивая загрузка
+    # (N+1 при выдаче списков) сразу падает с ошибкой, нужна явная загрузка
     sender: Mapped["User"] = relationship(
         "User",
         back_populates="payments_sent",
         foreign_keys=[sender_id],
-        lazy="joined",
+        lazy="raise",
     )
     recipient: Mapped["User"] = relationship(
         "User",
         back_populates="payments_received",
         foreign_keys=[recipient_id],
-        lazy="joined",
+        lazy="raise",
     )
 
     logs: Mapped[List["PaymentLog"]] = relationship(
         "PaymentLog",
         back_populates="payment",
         cascade="all, delete-orphan",
-        lazy="selectin",
     )
 
     __mapper_args__ = {
@@ -202,7 +205,17 @@ class Payment(Base):
     __table_args__ = (
         CheckConstraint("amount > 0", name="chk_payments_amount_positive"),
         CheckConstraint("char_length(card_last4) = 4", name="chk_card_last4_len"),
-        Index("ix_payments_sender_created_at", "sender_id", "created_at"),
+        # Keyset-пагинация списка платежей: ORDER BY created_at DESC, id DESC
+        Index("ix_payments_sender_created_at_id", "sender_id", "created_at", "id"),
+        # То же с фильтром по статусу: равенство по (sender_id, status) и уже
+        # упорядоченный хвост, фильтр по сумме проверяется на строках страницы
+        Index(
+            "ix_payments_sender_status_created_at_id",
+            "sender_id",
+            "status",
+            "created_at",
+            "id",
+        ),
     )
 
 
@@ -254,11 +267,9 @@ class PaymentLog(Base):
     )
 
     # Отношения
-    payment: Mapped["Payment"] = relationship(
-        "Payment", back_populates="logs", lazy="joined"
-    )
+    payment: Mapped["Payment"] = relationship("Payment", back_populates="logs")
     performed_by_user: Mapped[Optional["User"]] = relationship(
-        "User", back_populates="performed_logs", lazy="joined"
+        "User", back_populates="performed_logs"
     )
 
     __table_args__ = (
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import TIMESTAMP, ForeignKey
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -19,9 +19,19 @@ class RefreshToken(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(
         PG_UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
     )
-    token_hash: Mapped[str] = mapped_column(nullable=False)
+    token_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     expires_at: Mapped[datetime] = mapped_column(
-        nullable=False, type_=TIMESTAMP(timezone=True)
+        nullable=False, type_=TIMESTAMP(timezone=True), index=True
     )
 
     user: Mapped["User"] = relationship("User", back_populates="refresh_tokens")
+
+    __table_args__ = (
+        # Покрывающий индекс: поиск токена по хэшу обходится без чтения таблицы
+        Index(
+            "ix_refresh_tokens_token_hash",
+            "token_hash",
+            unique=True,
+            postgresql_include=["user_id", "expires_at", "id"],
+        ),
+    )
@@ -1,8 +1,12 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_async_session
-from app.core.jwt import update_tokens_pair
+from app.core.dependencies import add_jti_to_blocklist, optional_security
+from app.core.jwt import decode_access_token, revoke_refresh_token, update_tokens_pair
 from app.schemas.auth import (
     RefreshTokenRequest,
     TokensPair,
@@ -30,13 +34,6 @@ async def register_endpoint(
     return response
 
 
-# @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-# async def register(
-#     data: UserCreate, session: AsyncSession = Depends(get_async_session)
-# ):
-#     return await register_user(session=session, data=data)
-
-
 @router.post("/login", response_model=LoginResponse)
 async def login_endpoint(
     data: UserLogin, session: AsyncSession = Depends(get_async_session)
@@ -52,12 +49,26 @@ async def login_endpoint(
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-async def logout():
+async def logout(
+    data: Optional[RefreshTokenRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    session: AsyncSession = Depends(get_async_session),
+):
     """
-    Logout endpoint - in a stateless JWT implementation, this would typically
-    just return a success response as the client would discard the token.
-    In a stateful implementation, this would invalidate the token on the server side.
+    Logout endpoint - the client discards its tokens. When a refresh token is
+    sent it is revoked. When a valid access token is sent and Redis is enabled,
+    its jti is also added to the blocklist, so the token is rejected by every
+    worker until it expires. An expired or malformed access token is ignored.
     """
+    if credentials is not None:
+        try:
+            payload = await decode_access_token(credentials.credentials)
+        except HTTPException:
+            payload = {}
+        if "jti" in payload:
+            await add_jti_to_blocklist(payload["jti"], payload["exp"])
+    if data is not None:
+        await revoke_refresh_token(session, data.refresh_token)
     return
 
 
@@ -1,187 +1,223 @@
 from decimal import Decimal
-from typing import List, Optional
+from typing import Annotated, Any, AsyncIterator, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.db import get_async_session
-from app.core.dependencies import get_current_user
+from app.core.db import get_session_maker
+from app.core.dependencies import RequestContext, get_request_context
+from app.models.models import PaymentStatus
 from app.schemas.payments import (
+    PaymentBatchConfirm,
     PaymentCreate,
-    PaymentFilter,
+    PaymentLogRead,
+    PaymentPage,
     PaymentRead,
     PaymentUpdate,
 )
 from app.services.payments import (
     cancel_payment,
     confirm_payment,
+    confirm_payments,
     create_payment,
     delete_payment,
-    get_payment_by_id,
+    get_payment_for_participant,
     get_payment_logs,
     get_payments_by_user_id,
     list_payments,
+    stream_payment_logs,
     update_payment,
 )
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
+# FastAPI builds the UUID validator of a path parameter once per route, the
+# aliases only keep the declarations in one place.
+PaymentId = Annotated[UUID, Path(description="ID платежа")]
+UserId = Annotated[UUID, Path(description="ID пользователя")]
+
+_PAYMENT = TypeAdapter(PaymentRead)
+_PAYMENT_LIST = TypeAdapter(List[PaymentRead])
+_PAYMENT_PAGE = TypeAdapter(PaymentPage)
+_PAYMENT_LOG_LIST = TypeAdapter(List[PaymentLogRead])
+
+PageLimit = Annotated[int, Query(ge=1, le=200, description="Размер страницы")]
+PageCursor = Annotated[
+    Optional[str], Query(description="next_cursor предыдущей страницы")
+]
+
+
+def _json_response(
+    adapter: TypeAdapter, obj: Any, status_code: int = status.HTTP_200_OK
+) -> Response:
+    """
+    Serialize responses straight to JSON bytes in pydantic-core, without the
+    intermediate dicts that response_model + ORJSONResponse build.
+    response_model stays on the routes for the OpenAPI schema.
+    """
+    content = adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+    return Response(
+        content=content, status_code=status_code, media_type="application/json"
+    )
+
 
 @router.post("/", response_model=PaymentRead, status_code=status.HTTP_201_CREATED)
 async def create(
     data: PaymentCreate,
-    session: AsyncSession = Depends(get_async_session),
-    current_user=Depends(get_current_user),
+    ctx: RequestContext = Depends(get_request_context),
 ):
-    return await create_payment(session=session, data=data, current_user=current_user)
+    payment = await create_payment(
+        session=ctx.session, data=data, current_user=ctx.user
+    )
+    return _json_response(_PAYMENT, payment, status.HTTP_201_CREATED)
 
 
 @router.post("/{payment_id}/confirm", response_model=PaymentRead)
 async def confirm(
-    payment_id: UUID = Path(..., description="ID платежа"),
-    session: AsyncSession = Depends(get_async_session),
-    current_user=Depends(get_current_user),
+    payment_id: PaymentId,
+    ctx: RequestContext = Depends(get_request_context),
 ):
-    return await confirm_payment(
-        session=session, payment_id=payment_id, user=current_user
+    payment = await confirm_payment(
+        session=ctx.session, payment_id=payment_id, user=ctx.user
     )
+    return _json_response(_PAYMENT, payment)
+
+
+@router.post("/confirm-batch", response_model=List[PaymentRead])
+async def confirm_batch(
+    data: PaymentBatchConfirm,
+    ctx: RequestContext = Depends(get_request_context),
+):
+    payments = await confirm_payments(
+        session=ctx.session, payment_ids=data.payment_ids, user=ctx.user
+    )
+    return _json_response(_PAYMENT_LIST, payments)
 
 
 @router.post("/{payment_id}/cancel", response_model=PaymentRead)
 async def cancel(
-    payment_id: UUID = Path(..., description="ID платежа"),
-    session: AsyncSession = Depends(get_async_session),
-    current_user=Depends(get_current_user),
+    payment_id: PaymentId,
+    ctx: RequestContext = Depends(get_request_context),
 ):
-    return await cancel_payment(
-        session=session, payment_id=payment_id, user=current_user
+    payment = await cancel_payment(
+        session=ctx.session, payment_id=payment_id, user=ctx.user
     )
+    return _json_response(_PAYMENT, payment)
 
 
-@router.get("/", response_model=List[PaymentRead])
+@router.get("/", response_model=PaymentPage)
 async def get_payments(
-    status_filter: Optional[str] = Query(None, description="Фильтр по статусу"),
-    min_sum: Optional[float] = Query(None, description="Мин. сумма"),
-    max_sum: Optional[float] = Query(None, description="Макс. сумма"),
-    session: AsyncSession = Depends(get_async_session),
-    current_user=Depends(get_current_user),
+    status_filter: Optional[PaymentStatus] = Query(
+        None, description="Фильтр по статусу"
+    ),
+    min_sum: Optional[Decimal] = Query(None, ge=0, description="Мин. сумма"),
+    max_sum: Optional[Decimal] = Query(None, ge=0, description="Макс. сумма"),
+    limit: PageLimit = 50,
+    cursor: PageCursor = None,
+    ctx: RequestContext = Depends(get_request_context),
 ):
-    filters = PaymentFilter(
-        status=status_filter,
-        min_sum=Decimal(str(min_sum)) if min_sum is not None else None,
-        max_sum=Decimal(str(max_sum)) if max_sum is not None else None,
+    payments, next_cursor = await list_payments(
+        session=ctx.session,
+        user=ctx.user,
+        status_filter=status_filter,
+        min_sum=min_sum,
+        max_sum=max_sum,
+        limit=limit,
+        cursor=cursor,
+    )
+    return _json_response(
+        _PAYMENT_PAGE, {"items": payments, "next_cursor": next_cursor}
     )
-    return await list_payments(session=session, user=current_user, filters=filters)
 
 
 @router.get("/{payment_id}", response_model=PaymentRead)
 async def get_payment(
-    payment_id: UUID = Path(..., description="ID платежа"),
-    session: AsyncSession = Depends(get_async_session),
-    current_user=Depends(get_current_user),
+    payment_id: PaymentId,
+    ctx: RequestContext = Depends(get_request_context),
 ):
-    payment = await get_payment_by_id(session=session, payment_id=payment_id)
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
-        )
-    # Check if user is authorized to view this payment
-    if payment.sender_id != current_user.id and payment.recipient_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this payment",
-        )
-    return payment
+    payment = await get_payment_for_participant(
+        session=ctx.session, payment_id=payment_id, user=ctx.user
+    )
+    return _json_response(_PAYMENT, payment)
 
 
 @router.put("/{payment_id}", response_model=PaymentRead)
 async def update_payment_status(
     data: PaymentUpdate,
-    payment_id: UUID = Path(..., description="ID платежа"),
-    session: AsyncSession = Depends(get_async_session),
-    current_user=Depends(get_current_user),
+    payment_id: PaymentId,
+    ctx: RequestContext = Depends(get_request_context),
 ):
-    payment = await get_payment_by_id(session=session, payment_id=payment_id)
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
-        )
-    # Check if user is authorized to update this payment
-    if payment.sender_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this payment",
-        )
-    return await update_payment(
-        session=session, payment_id=payment_id, data=data, user=current_user
+    payment = await update_payment(
+        session=ctx.session, payment_id=payment_id, data=data, user=ctx.user
     )
+    return _json_response(_PAYMENT, payment)
 
 
 @router.delete("/{payment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_payment_endpoint(
-    payment_id: UUID = Path(..., description="ID платежа"),
-    session: AsyncSession = Depends(get_async_session),
-    current_user=Depends(get_current_user),
+    payment_id: PaymentId,
+    ctx: RequestContext = Depends(get_request_context),
 ):
-    payment = await get_payment_by_id(session=session, payment_id=payment_id)
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
-        )
-    # Check if user is authorized to delete this payment
-    if payment.sender_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this payment",
-        )
-    await delete_payment(session=session, payment_id=payment_id, user=current_user)
+    await delete_payment(session=ctx.session, payment_id=payment_id, user=ctx.user)
     return
 
 
-@router.get("/{payment_id}/logs", response_model=List[dict])
+@router.get("/{payment_id}/logs", response_model=List[PaymentLogRead])
 async def get_logs(
-    payment_id: UUID = Path(..., description="ID платежа"),
-    session: AsyncSession = Depends(get_async_session),
-    current_user=Depends(get_current_user),
+    payment_id: PaymentId,
+    ctx: RequestContext = Depends(get_request_context),
 ):
-    payment = await get_payment_by_id(session=session, payment_id=payment_id)
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
-        )
-    # Check if user is authorized to view logs for this payment
-    if payment.sender_id != current_user.id and payment.recipient_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view logs for this payment",
-        )
-    logs = await get_payment_logs(session=session, payment_id=payment_id)
-    # Convert logs to dict format for response
-    return [
-        {
-            "id": str(log.id),
-            "prev_status": log.prev_status.value,
-            "new_status": log.new_status.value,
-            "amount": str(log.amount) if log.amount else None,
-            "note": log.note,
-            "created_at": log.created_at.isoformat(),
-        }
-        for log in logs
-    ]
-
-
-@router.get("/user/{user_id}", response_model=List[PaymentRead])
+    logs = await get_payment_logs(
+        session=ctx.session, payment_id=payment_id, user=ctx.user
+    )
+    return _json_response(_PAYMENT_LOG_LIST, logs)
+
+
+@router.get("/{payment_id}/logs/stream", response_class=StreamingResponse)
+async def stream_logs(
+    payment_id: PaymentId,
+    ctx: RequestContext = Depends(get_request_context),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+):
+    """
+    Payment logs as NDJSON, one PaymentLogRead object per line, written while
+    the rows are read from the database.
+    """
+    logs = await stream_payment_logs(
+        session=ctx.session,
+        payment_id=payment_id,
+        user=ctx.user,
+        session_maker=session_maker,
+    )
+    return StreamingResponse(_ndjson(logs), media_type="application/x-ndjson")
+
+
+async def _ndjson(logs: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    async for log in logs:
+        yield PaymentLogRead.model_validate(log).model_dump_json().encode() + b"\n"
+
+
+@router.get("/user/{user_id}", response_model=PaymentPage)
 async def get_payments_for_user(
-    user_id: UUID = Path(..., description="ID пользователя"),
-    session: AsyncSession = Depends(get_async_session),
-    current_user=Depends(get_current_user),
+    user_id: UserId,
+    limit: PageLimit = 50,
+    cursor: PageCursor = None,
+    ctx: RequestContext = Depends(get_request_context),
 ):
     """
     Get all payments for a given user ID.
     Only the user themselves can access this information.
     """
-    payments = await get_payments_by_user_id(
-        session=session, user_id=user_id, current_user=current_user
+    payments, next_cursor = await get_payments_by_user_id(
+        session=ctx.session,
+        user_id=user_id,
+        current_user=ctx.user,
+        limit=limit,
+        cursor=cursor,
+    )
+    return _json_response(
+        _PAYMENT_PAGE, {"items": payments, "next_cursor": next_cursor}
     )
-    return payments
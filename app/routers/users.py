@@ -1,17 +1,51 @@
-from fastapi import APIRouter, Depends, status
+from typing import Any, Callable
+from uuid import UUID
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache_get, cache_set, user_balance_key, user_me_key
+from app.core.config import get_settings
 from app.core.db import get_async_session
-from app.core.dependencies import get_current_active_user, get_current_user
+from app.core.dependencies import get_current_active_user, get_current_user_id
+from app.models.models import User
 from app.schemas.users import BalanceUpdate, UserRead, UserUpdate
-from app.services.auth import update_user_balance, update_user_profile
+from app.services.auth import get_user_by_id, update_user_balance, update_user_profile
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
+async def _cached_user_response(
+    session: AsyncSession, user_id: UUID, key: str, render: Callable[[User], Any]
+) -> Response:
+    """
+    Serve the response from Redis; on a miss load the user and cache the JSON.
+    Cache entries are dropped by invalidate_user_cache when the row changes.
+    """
+    content = await cache_get(key)
+    if content is None:
+        user = await get_user_by_id(session, user_id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+            )
+        content = orjson.dumps(render(user))
+        await cache_set(key, content, get_settings().USER_CACHE_TTL_SECONDS)
+    return Response(content=content, media_type="application/json")
+
+
 @router.get("/me", response_model=UserRead)
-async def get_me(current_user=Depends(get_current_user)):
-    return current_user
+async def get_me(
+    user_id: UUID = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await _cached_user_response(
+        session,
+        user_id,
+        user_me_key(user_id),
+        lambda user: UserRead.model_validate(user).model_dump(mode="json"),
+    )
 
 
 @router.put("/me", response_model=UserRead, status_code=status.HTTP_200_OK)
@@ -26,11 +60,19 @@ async def update_me(
 
 
 @router.get("/me/balance", response_model=dict)
-async def get_balance(current_user=Depends(get_current_user)):
+async def get_balance(
+    user_id: UUID = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_async_session),
+):
     """
     Get current user's balance.
     """
-    return {"balance": current_user.balance}
+    return await _cached_user_response(
+        session,
+        user_id,
+        user_balance_key(user_id),
+        lambda user: {"balance": str(user.balance)},
+    )
 
 
 @router.post("/me/balance", response_model=UserRead, status_code=status.HTTP_200_OK)
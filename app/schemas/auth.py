@@ -6,22 +6,11 @@ from pydantic import (
 )
 
 
-class UserCreate(BaseModel):
-    email: EmailStr
-    username: str
-    password: str = Field(..., min_length=6)
-
-
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
 
-class Token(BaseModel):
-    access_token: str
-    token_type: str = "bearer"
-
-
 class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -27,6 +27,12 @@ class PaymentCreate(PaymentBase):
     recipient_id: UUID
 
 
+class PaymentBatchConfirm(BaseModel):
+    payment_ids: List[UUID] = Field(
+        ..., min_length=1, max_length=100, description="ID платежей"
+    )
+
+
 class PaymentRead(BaseModel):
     id: UUID
     sender_id: UUID
@@ -38,14 +44,26 @@ class PaymentRead(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
-class PaymentUpdate(BaseModel):
-    status: PaymentStatus
+class PaymentPage(BaseModel):
+    items: List[PaymentRead]
+    next_cursor: Optional[str] = Field(
+        None, description="Курсор следующей страницы, None на последней"
+    )
 
 
-class PaymentFilter(BaseModel):
-    status: Optional[str] = None
-    min_sum: Optional[Decimal] = None
-    max_sum: Optional[Decimal] = None
+class PaymentLogRead(BaseModel):
+    id: UUID
+    prev_status: PaymentStatus
+    new_status: PaymentStatus
+    amount: Optional[Decimal] = None
+    note: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class PaymentUpdate(BaseModel):
+    status: PaymentStatus
@@ -3,7 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class UserRead(BaseModel):
@@ -13,7 +13,7 @@ class UserRead(BaseModel):
     balance: Decimal
     created_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class UserUpdate(BaseModel):
@@ -22,11 +22,7 @@ class UserUpdate(BaseModel):
 
 
 class BalanceUpdate(BaseModel):
-    amount: float
-
-
-class GetUserByTokenResponse(BaseModel):
-    user_id: str
+    amount: Decimal = Field(..., gt=0, max_digits=14, decimal_places=2)
 
 
 class UserLoginResponse(BaseModel):
@@ -34,7 +30,7 @@ class UserLoginResponse(BaseModel):
     username: str
     id: uuid.UUID
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class UserBasicResponse(BaseModel):
@@ -42,7 +38,7 @@ class UserBasicResponse(BaseModel):
     username: str
     email: str
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class LoginResponse(BaseModel):
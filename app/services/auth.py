@@ -3,18 +3,18 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, lambda_stmt, literal, or_, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import find_uniquiness_conflicts
-from app.core.jwt import create_access_token, create_token_pair
+from app.core.cache import invalidate_user_cache
+from app.core.jwt import create_token_pair
 from app.core.security import (
     hash_password,
     verify_password,
 )
 from app.models.models import User
-from app.schemas.auth import TokensPair, UserLogin, UserRegistration
+from app.schemas.auth import TokensPair, UserRegistration
 from app.schemas.users import (
     LoginResponse,
     UserBasicResponse,
@@ -22,6 +22,49 @@ from app.schemas.users import (
     UserUpdate,
 )
 
+# Statements of the hot paths are built once; only parameters change per call,
+# so every execution hits SQLAlchemy's compiled cache and asyncpg's
+# prepared statement cache.
+_USER_BY_LOGIN = select(User).where(
+    or_(User.username == bindparam("login"), User.email == bindparam("login"))
+)
+_EMAIL_TAKEN_BY_OTHER = (
+    select(literal(1))
+    .where(User.email == bindparam("email"), User.id != bindparam("user_id"))
+    .limit(1)
+)
+
+
+async def find_uniquiness_conflicts(
+    db: AsyncSession, username: str, email: str
+) -> dict[str, str]:
+    """Check if the username, email, or phone already exists in the database."""
+
+    # Two LIMIT 1 probes let Postgres stop at the first match on each of the
+    # lower(...) indexes. lambda_stmt caches the statements and their compiled
+    # SQL, username/email are tracked as bound parameters.
+    username_taken = await db.scalar(
+        lambda_stmt(
+            lambda: select(literal(1))
+            .where(func.lower(User.username) == func.lower(username))
+            .limit(1)
+        )
+    )
+    email_taken = await db.scalar(
+        lambda_stmt(
+            lambda: select(literal(1))
+            .where(func.lower(User.email) == func.lower(email))
+            .limit(1)
+        )
+    )
+
+    problems: dict[str, str] = {}
+    if username_taken:
+        problems["username"] = "уже занят"
+    if email_taken:
+        problems["email"] = "уже занята"
+    return problems
+
 
 async def register(db: AsyncSession, data: UserRegistration) -> UserBasicResponse:
     stmt = (
@@ -29,15 +72,15 @@ async def register(db: AsyncSession, data: UserRegistration) -> UserBasicRespons
         .values(
             username=data.username,
             email=data.email,
-            hashed_password=hash_password(data.password),
+            hashed_password=await hash_password(data.password),
         )
         .on_conflict_do_nothing()
-        .returning(User.id)
+        .returning(User)
     )
 
-    result = await db.execute(stmt)
-    row = result.first()
-    if row is None:
+    # The whole row comes back with the INSERT, no reload after commit
+    user = (await db.scalars(stmt)).one_or_none()
+    if user is None:
         conflicts = await find_uniquiness_conflicts(db, data.username, data.email)
         if not conflicts:
             conflicts = {"detail": "Конфликт уникальности"}
@@ -47,57 +90,15 @@ async def register(db: AsyncSession, data: UserRegistration) -> UserBasicRespons
             detail=conflicts,
         )
 
-    user_id = row[0]
     await db.commit()
-
-    user = await db.get(User, user_id)
     return UserBasicResponse.model_validate(user)
 
 
-# async def register_user(session: AsyncSession, data: UserCreate) -> dict:
-#     stmt = select(User).where(User.email == data.email)
-#     result = await session.execute(stmt)
-#     existing_user = result.scalar_one_or_none()
-#     if existing_user:
-#         raise HTTPException(
-#             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
-#         )
-
-#     hashed_password = get_password_hash(data.password)
-#     user = User(
-#         email=data.email,
-#         username=data.username,
-#         hashed_password=hashed_password,
-#     )
-#     session.add(user)
-#     await session.commit()
-#     await session.refresh(user)
-
-#     access_token = create_access_token(user_id=user.id)
-#     return {"access_token": access_token, "token_type": "bearer"}
-
-
 async def get_user_by_id(session: AsyncSession, user_id: UUID) -> Optional[User]:
     """
     Get user by ID.
     """
-    stmt = select(User).where(User.id == user_id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
-    return user
-
-
-async def authenticate_user(session: AsyncSession, data: UserLogin) -> Optional[dict]:
-    stmt = select(User).where(User.email == data.email)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
-    if not user:
-        return None
-    if not verify_password(data.password, user.hashed_password):
-        return None
-
-    access_token = create_access_token(user_id=user.id)
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await session.get(User, user_id)
 
 
 async def update_user_profile(
@@ -106,64 +107,78 @@ async def update_user_profile(
     """
     Update user profile.
     """
-    stmt = select(User).where(User.id == user_id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
     # Update fields if provided
+    values = {}
     if data.username is not None:
-        user.username = data.username
+        values["username"] = data.username
     if data.email is not None:
         # Check if email is already taken by another user
-        email_stmt = select(User).where(User.email == data.email, User.id != user_id)
-        email_result = await session.execute(email_stmt)
-        existing_user = email_result.scalar_one_or_none()
-        if existing_user:
+        email_taken = await session.scalar(
+            _EMAIL_TAKEN_BY_OTHER, {"email": data.email, "user_id": user_id}
+        )
+        if email_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
-        user.email = data.email
+        values["email"] = data.email
+
+    if not values:
+        user = await session.get(User, user_id)
+    else:
+        user = await _update_user_returning(session, user_id, values)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
 
     await session.commit()
-    await session.refresh(user)
+    await invalidate_user_cache(user_id)
     return user
 
 
 async def update_user_balance(
-    session: AsyncSession, user_id: UUID, amount: float
+    session: AsyncSession, user_id: UUID, amount: Decimal
 ) -> User:
     """
     Update user balance by adding the specified amount.
     """
-    stmt = select(User).where(User.id == user_id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    # Atomic increment on the database side, no lost updates between requests
+    user = await _update_user_returning(
+        session, user_id, {"balance": User.balance + amount}
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    # Update balance
-    user.balance += Decimal(str(amount))
-
     await session.commit()
-    await session.refresh(user)
+    await invalidate_user_cache(user_id)
     return user
 
 
+async def _update_user_returning(
+    session: AsyncSession, user_id: UUID, values: dict
+) -> Optional[User]:
+    """
+    UPDATE the user row and return it in the same round-trip. populate_existing
+    refreshes the instance already loaded into the session by get_current_user.
+    """
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(**values)
+        .returning(User)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
 async def login(
     username_or_email: str, password: str, db: AsyncSession
 ) -> LoginResponse:
-    user = await db.execute(
-        select(User).where(
-            (User.username == username_or_email) | (User.email == username_or_email)
-        )
-    )
+    user = await db.execute(_USER_BY_LOGIN, {"login": username_or_email})
 
     user = user.scalar_one_or_none()
 
@@ -173,7 +188,7 @@ async def login(
             detail="Invalid email/username or password",
         )
 
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email/username or password",
@@ -1,238 +1,602 @@
-from typing import List, Optional
-from uuid import UUID
+import base64
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Dict, List, Optional
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
+from sqlalchemy import (
+    Numeric,
+    Uuid,
+    any_,
+    bindparam,
+    case,
+    column,
+    delete,
+    exists,
+    func,
+    insert,
+    lambda_stmt,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.core.cache import invalidate_user_cache
 from app.models.models import Payment, PaymentLog, PaymentStatus, User
-from app.schemas.payments import PaymentCreate, PaymentFilter, PaymentUpdate
+from app.schemas.payments import PaymentCreate, PaymentUpdate
+
+# Below this size a multi-row INSERT is cheaper than setting up a COPY
+_COPY_THRESHOLD = 1000
+_COPY_LOG_COLUMNS = (
+    "payment_id",
+    "performed_by",
+    "prev_status",
+    "new_status",
+    "amount",
+    "note",
+)
+
+# Statements of the read paths are built once, see app/services/auth.py
+_IS_PARTICIPANT = or_(
+    Payment.sender_id == bindparam("user_id"),
+    Payment.recipient_id == bindparam("user_id"),
+)
+_PAYMENT_EXISTS = select(literal(1)).where(Payment.id == bindparam("payment_id"))
+_PARTICIPANT_PAYMENT = select(Payment).where(
+    Payment.id == bindparam("payment_id"), _IS_PARTICIPANT
+)
+_PARTICIPANT_PAYMENT_EXISTS = select(literal(1)).where(
+    Payment.id == bindparam("payment_id"), _IS_PARTICIPANT
+)
+_PARTICIPANT_PAYMENT_LOGS = (
+    select(PaymentLog)
+    .join(Payment, Payment.id == PaymentLog.payment_id)
+    .where(PaymentLog.payment_id == bindparam("payment_id"), _IS_PARTICIPANT)
+)
 
 
 async def create_payment(
     session: AsyncSession, data: PaymentCreate, current_user: User
 ) -> Payment:
-    # Проверяем, что получатель существует
-    stmt = select(User).where(User.id == data.recipient_id)
-    result = await session.execute(stmt)
-    recipient = result.scalar_one_or_none()
-    if not recipient:
+    # Проверка получателя входит в сам INSERT: строка вставляется, только если
+    # получатель существует, и возвращается через RETURNING за один запрос
+    values = {
+        "sender_id": current_user.id,
+        "recipient_id": data.recipient_id,
+        "card_last4": data.card_last4,
+        "card_holder": data.card_holder,
+        "amount": data.amount,
+    }
+    rows = select(*map(literal, values.values())).where(
+        exists().where(User.id == data.recipient_id)
+    )
+    stmt = insert(Payment).from_select(list(values), rows).returning(Payment)
+    payment = await session.scalar(stmt)
+    if payment is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Recipient not found"
         )
 
-    payment = Payment(
-        sender_id=current_user.id,
-        recipient_id=data.recipient_id,
-        card_last4=data.card_last4,
-        card_holder=data.card_holder,
-        amount=data.amount,
-        status=PaymentStatus.CREATED,
-    )
-    session.add(payment)
     await session.commit()
-    await session.refresh(payment)
     return payment
 
 
+async def _flush_logs(session: AsyncSession, rows: List[dict]) -> None:
+    """
+    Write accumulated PaymentLog rows with one multi-row INSERT.
+    Callers collect the rows in a list and flush them once before commit.
+    Large batches (backfills, audit replays) go through binary COPY instead.
+    """
+    if len(rows) >= _COPY_THRESHOLD:
+        await _copy_logs(session, rows)
+    elif rows:
+        await session.execute(insert(PaymentLog), rows)
+
+
+async def _copy_logs(session: AsyncSession, rows: List[dict]) -> None:
+    # COPY runs on the asyncpg connection of the session, inside its
+    # transaction; created_at is filled by the column default
+    await session.flush()
+    columns = ["id", *_COPY_LOG_COLUMNS]
+    records = [
+        (
+            uuid4(),
+            row["payment_id"],
+            row.get("performed_by"),
+            PaymentStatus(row["prev_status"]).value,
+            PaymentStatus(row["new_status"]).value,
+            row.get("amount"),
+            row.get("note"),
+        )
+        for row in rows
+    ]
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        PaymentLog.__tablename__, records=records, columns=columns
+    )
+
+
 async def confirm_payment(
     session: AsyncSession, payment_id: UUID, user: User
 ) -> Payment:
-    stmt = select(Payment).where(Payment.id == payment_id)
-    result = await session.execute(stmt)
-    payment = result.scalar_one_or_none()
-    if not payment:
+    """
+    Confirm payment and move the amount from sender to recipient.
+
+    Everything is one statement of chained CTEs: every step reads the rows
+    returned by the previous one, so nothing is written unless the payment is
+    still CREATED and the sender can afford it. On a self-payment the balance
+    is left as is, PostgreSQL would apply only one of two updates of the row.
+    """
+    pending = (
+        select(Payment.id, Payment.sender_id, Payment.recipient_id, Payment.amount)
+        .where(Payment.id == payment_id, Payment.status == PaymentStatus.CREATED)
+        .with_for_update()
+        .cte("pending")
+    )
+    debit = (
+        update(User)
+        .where(User.id == pending.c.sender_id, User.balance >= pending.c.amount)
+        .values(
+            balance=User.balance
+            - case((User.id == pending.c.recipient_id, 0), else_=pending.c.amount)
+        )
+        .returning(
+            pending.c.id,
+            pending.c.sender_id,
+            pending.c.recipient_id,
+            pending.c.amount,
+        )
+        .cte("debit")
+    )
+    credit = (
+        update(User)
+        .where(
+            User.id == debit.c.recipient_id,
+            debit.c.recipient_id != debit.c.sender_id,
+        )
+        .values(balance=User.balance + debit.c.amount)
+        .cte("credit")
+    )
+    log_values = {
+        "payment_id": debit.c.id,
+        "performed_by": literal(user.id),
+        "prev_status": literal(PaymentStatus.CREATED, PaymentLog.prev_status.type),
+        "new_status": literal(PaymentStatus.PAID, PaymentLog.new_status.type),
+        "amount": debit.c.amount,
+        "note": literal("Payment confirmed"),
+    }
+    log = (
+        insert(PaymentLog)
+        .from_select(list(log_values), select(*log_values.values()))
+        .cte("log")
+    )
+    stmt = (
+        update(Payment)
+        .where(Payment.id == debit.c.id)
+        .values(status=PaymentStatus.PAID, version=Payment.version + 1)
+        .returning(Payment)
+        .add_cte(credit, log)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    payment = await session.scalar(stmt)
+    if payment is None:
+        stmt = select(Payment.status).where(Payment.id == payment_id)
+        payment_status = await session.scalar(stmt)
+        if payment_status is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
+            )
+        if payment_status in {PaymentStatus.PAID, PaymentStatus.CANCELED}:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Payment already finalized",
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient balance"
         )
 
-    if payment.status in {PaymentStatus.PAID, PaymentStatus.CANCELED}:
+    await session.commit()
+    await invalidate_user_cache(payment.sender_id, payment.recipient_id)
+    return payment
+
+
+async def confirm_payments(
+    session: AsyncSession, payment_ids: List[UUID], user: User
+) -> List[Payment]:
+    """
+    Confirm several payments of the user in one transaction, all or nothing.
+
+    The number of statements does not depend on the batch size: one UPDATE
+    of the payments, one locking SELECT of the balances, one UPDATE of the
+    balances joined to unnest() of the per-user totals, one multi-row INSERT
+    of the logs. Rows are locked in id order, so overlapping batches wait
+    for each other instead of deadlocking.
+    """
+    payment_ids = list(dict.fromkeys(payment_ids))
+    # rollback() expires the user loaded into this session
+    user_id = user.id
+    # Массивы передаются одним параметром: текст запросов не зависит от
+    # размера пачки, и asyncpg переиспользует подготовленный запрос
+    ids = literal(payment_ids, ARRAY(Uuid))
+    pending = (
+        select(Payment.id)
+        .where(
+            Payment.id == any_(ids),
+            Payment.sender_id == user_id,
+            Payment.status == PaymentStatus.CREATED,
+        )
+        .order_by(Payment.id)
+        .with_for_update()
+        .cte("pending")
+    )
+    stmt = (
+        update(Payment)
+        .where(Payment.id == pending.c.id)
+        .values(status=PaymentStatus.PAID, version=Payment.version + 1)
+        .returning(Payment)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    payments = {p.id: p for p in await session.scalars(stmt)}
+    if len(payments) < len(payment_ids):
+        await session.rollback()
+        stmt = select(Payment.sender_id, Payment.status).where(Payment.id == any_(ids))
+        rows = (await session.execute(stmt)).all()
+        if len(rows) < len(payment_ids):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
+            )
+        if any(row.sender_id != user_id for row in rows):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to confirm this payment",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Payment already finalized",
         )
 
-    # Проверка баланса отправителя
-    sender_stmt = select(User).where(User.id == payment.sender_id)
-    sender_result = await session.execute(sender_stmt)
-    sender = sender_result.scalar_one()
-    if sender.balance < payment.amount:
+    # Каждый отправитель должен покрыть все свои списания: поступления
+    # из той же пачки их не оплачивают. Платёж самому себе баланс не меняет
+    debits: Dict[UUID, Decimal] = defaultdict(Decimal)
+    deltas: Dict[UUID, Decimal] = defaultdict(Decimal)
+    for payment in payments.values():
+        debits[payment.sender_id] += payment.amount
+        deltas[payment.sender_id] -= payment.amount
+        deltas[payment.recipient_id] += payment.amount
+    user_ids = literal(list(deltas), ARRAY(Uuid))
+    stmt = (
+        select(User.id, User.balance)
+        .where(User.id == any_(user_ids))
+        .order_by(User.id)
+        .with_for_update()
+    )
+    balances = dict((await session.execute(stmt)).tuples().all())
+    if any(balances[sender_id] < debit for sender_id, debit in debits.items()):
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient balance"
         )
 
-    # Получатель
-    recipient_stmt = select(User).where(User.id == payment.recipient_id)
-    recipient_result = await session.execute(recipient_stmt)
-    recipient = recipient_result.scalar_one()
-
-    # Обновление статуса и балансов
-    payment.status = PaymentStatus.PAID
-    sender.balance -= payment.amount
-    recipient.balance += payment.amount
-
-    # Логируем изменение
-    log = PaymentLog(
-        payment_id=payment.id,
-        performed_by=user.id,
-        prev_status=PaymentStatus.CREATED,
-        new_status=PaymentStatus.PAID,
-        amount=payment.amount,
-        note="Payment confirmed",
+    changes = (
+        func.unnest(user_ids, literal(list(deltas.values()), ARRAY(Numeric(14, 2))))
+        .table_valued(column("user_id", Uuid), column("delta", Numeric(14, 2)))
+        .render_derived(name="changes")
     )
-    session.add(log)
+    stmt = (
+        update(User)
+        .where(User.id == changes.c.user_id)
+        .values(balance=User.balance + changes.c.delta)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
+
+    logs = [
+        {
+            "payment_id": payment.id,
+            "performed_by": user_id,
+            "prev_status": PaymentStatus.CREATED,
+            "new_status": PaymentStatus.PAID,
+            "amount": payment.amount,
+            "note": "Payment confirmed",
+        }
+        for payment in payments.values()
+    ]
+    await _flush_logs(session, logs)
 
     await session.commit()
-    await session.refresh(payment)
-    return payment
+    await invalidate_user_cache(*deltas)
+    return [payments[payment_id] for payment_id in payment_ids]
 
 
 async def cancel_payment(
     session: AsyncSession, payment_id: UUID, user: User
 ) -> Payment:
-    stmt = select(Payment).where(Payment.id == payment_id)
-    result = await session.execute(stmt)
-    payment = result.scalar_one_or_none()
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
-        )
-
-    if payment.status in {PaymentStatus.PAID, PaymentStatus.CANCELED}:
+    # Статус проверяется в самом UPDATE, строка возвращается через RETURNING
+    stmt = (
+        update(Payment)
+        .where(Payment.id == payment_id, Payment.status == PaymentStatus.CREATED)
+        .values(status=PaymentStatus.CANCELED, version=Payment.version + 1)
+        .returning(Payment)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    payment = await session.scalar(stmt)
+    if payment is None:
+        stmt = select(literal(1)).where(Payment.id == payment_id)
+        if await session.scalar(stmt) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Payment already finalized",
         )
 
-    payment.status = PaymentStatus.CANCELED
-
-    log = PaymentLog(
-        payment_id=payment.id,
-        performed_by=user.id,
-        prev_status=PaymentStatus.CREATED,
-        new_status=PaymentStatus.CANCELED,
-        amount=payment.amount,
-        note="Payment canceled",
-    )
-    session.add(log)
+    logs = [
+        {
+            "payment_id": payment.id,
+            "performed_by": user.id,
+            "prev_status": PaymentStatus.CREATED,
+            "new_status": PaymentStatus.CANCELED,
+            "amount": payment.amount,
+            "note": "Payment canceled",
+        }
+    ]
+    await _flush_logs(session, logs)
 
     await session.commit()
-    await session.refresh(payment)
     return payment
 
 
-async def list_payments(session: AsyncSession, user: User, filters: PaymentFilter):
-    stmt = select(Payment).where(Payment.sender_id == user.id)
+def _encode_cursor(payment: Payment) -> str:
+    raw = f"{payment.created_at.isoformat()}|{payment.id.hex}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, payment_id = raw.split("|")
+        timestamp = datetime.fromisoformat(created_at)
+        if timestamp.tzinfo is None:
+            # created_at is timestamptz, a naive value would shift the keyset
+            raise ValueError(created_at)
+        return timestamp, UUID(hex=payment_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from None
 
-    if filters.status:
-        stmt = stmt.where(Payment.status == filters.status)
-    if filters.min_sum:
-        stmt = stmt.where(Payment.amount >= filters.min_sum)
-    if filters.max_sum:
-        stmt = stmt.where(Payment.amount <= filters.max_sum)
 
-    result = await session.execute(stmt)
-    payments = result.scalars().all()
-    return payments
+async def _paginate(
+    session: AsyncSession,
+    stmt: StatementLambdaElement,
+    limit: int,
+    cursor: Optional[str],
+) -> tuple[List[Payment], Optional[str]]:
+    """
+    Keyset pagination, newest first. The cursor is (created_at, id) of the last
+    row of the previous page: id breaks ties between payments created in one
+    transaction, and no OFFSET rows have to be scanned and thrown away.
+    """
+    if cursor is not None:
+        created_at, payment_id = _decode_cursor(cursor)
+        stmt += lambda s: s.where(
+            tuple_(Payment.created_at, Payment.id) < tuple_(created_at, payment_id)
+        )
+    page_size = limit + 1
+    stmt += lambda s: s.order_by(Payment.created_at.desc(), Payment.id.desc())
+    stmt += lambda s: s.limit(page_size)
+    payments = list((await session.scalars(stmt)).all())
+
+    next_cursor = None
+    if len(payments) > limit:
+        del payments[limit:]
+        next_cursor = _encode_cursor(payments[-1])
+    return payments, next_cursor
+
+
+async def list_payments(
+    session: AsyncSession,
+    user: User,
+    status_filter: Optional[PaymentStatus] = None,
+    min_sum: Optional[Decimal] = None,
+    max_sum: Optional[Decimal] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> tuple[List[Payment], Optional[str]]:
+    # lambda_stmt caches the statement for each combination of filters, the
+    # closure values are tracked as bound parameters
+    user_id = user.id
+    stmt = lambda_stmt(lambda: select(Payment).where(Payment.sender_id == user_id))
+    if status_filter is not None:
+        stmt += lambda s: s.where(Payment.status == status_filter)
+    if min_sum is not None:
+        stmt += lambda s: s.where(Payment.amount >= min_sum)
+    if max_sum is not None:
+        stmt += lambda s: s.where(Payment.amount <= max_sum)
+
+    return await _paginate(session, stmt, limit, cursor)
+
+
+async def _payment_access_error(
+    session: AsyncSession, payment_id: UUID, detail: str
+) -> HTTPException:
+    """
+    Build the error for a payment the authorized query did not return.
+    Runs only on the failure path: 404 if the payment is missing, 403 otherwise.
+    """
+    if await session.scalar(_PAYMENT_EXISTS, {"payment_id": payment_id}) is None:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
+        )
+    return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
 
 
-async def get_payment_by_id(
-    session: AsyncSession, payment_id: UUID
-) -> Optional[Payment]:
+async def get_payment_for_participant(
+    session: AsyncSession, payment_id: UUID, user: User
+) -> Payment:
     """
-    Get payment by ID.
+    Get payment by ID if the user is its sender or recipient.
     """
-    stmt = select(Payment).where(Payment.id == payment_id)
-    result = await session.execute(stmt)
-    payment = result.scalar_one_or_none()
+    params = {"payment_id": payment_id, "user_id": user.id}
+    payment = await session.scalar(_PARTICIPANT_PAYMENT, params)
+    if payment is None:
+        raise await _payment_access_error(
+            session, payment_id, "Not authorized to view this payment"
+        )
     return payment
 
 
-async def get_payment_logs(session: AsyncSession, payment_id: UUID) -> List[PaymentLog]:
+async def get_payment_logs(
+    session: AsyncSession, payment_id: UUID, user: User
+) -> List[PaymentLog]:
     """
-    Get payment logs by payment ID.
+    Get payment logs by payment ID if the user is a participant of the payment.
     """
-    stmt = select(PaymentLog).where(PaymentLog.payment_id == payment_id)
-    result = await session.execute(stmt)
-    logs = list(result.scalars().all())
+    params = {"payment_id": payment_id, "user_id": user.id}
+    logs = list((await session.scalars(_PARTICIPANT_PAYMENT_LOGS, params)).all())
+    if not logs:
+        # Пустой результат: либо у платежа нет логов, либо нет доступа
+        if await session.scalar(_PARTICIPANT_PAYMENT_EXISTS, params) is None:
+            raise await _payment_access_error(
+                session, payment_id, "Not authorized to view logs for this payment"
+            )
     return logs
 
 
+async def stream_payment_logs(
+    session: AsyncSession,
+    payment_id: UUID,
+    user: User,
+    session_maker: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[PaymentLog]:
+    """
+    Check access and return an iterator over payment logs fetched in batches.
+    Errors are raised here, before the response starts streaming.
+    """
+    params = {"payment_id": payment_id, "user_id": user.id}
+    if await session.scalar(_PARTICIPANT_PAYMENT_EXISTS, params) is None:
+        raise await _payment_access_error(
+            session, payment_id, "Not authorized to view logs for this payment"
+        )
+    return _iter_payment_logs(session_maker, payment_id)
+
+
+async def _iter_payment_logs(
+    session_maker: async_sessionmaker[AsyncSession], payment_id: UUID
+) -> AsyncIterator[PaymentLog]:
+    stmt = (
+        select(PaymentLog)
+        .where(PaymentLog.payment_id == payment_id)
+        .order_by(PaymentLog.created_at)
+        .execution_options(yield_per=100)
+    )
+    # The body is sent after the request session has been closed, so the
+    # stream reads through a session of its own
+    async with session_maker() as session:
+        async for log in await session.stream_scalars(stmt):
+            yield log
+
+
 async def update_payment(
     session: AsyncSession, payment_id: UUID, data: PaymentUpdate, user: User
 ) -> Payment:
     """
-    Update payment status.
+    Update payment status. Only the sender can update a payment.
     """
-    # Start a transaction
-    stmt = select(Payment).where(Payment.id == payment_id).with_for_update()
-    result = await session.execute(stmt)
-    payment = result.scalar_one_or_none()
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
+    # One UPDATE: the sender check is part of the locking subquery, which
+    # also hands the previous status for logging to RETURNING
+    new_status = PaymentStatus(data.status.value)
+    previous = (
+        select(Payment.id, Payment.status)
+        .where(Payment.id == payment_id, Payment.sender_id == user.id)
+        .with_for_update()
+        .subquery("previous")
+    )
+    stmt = (
+        update(Payment)
+        .where(Payment.id == previous.c.id)
+        .values(status=new_status, version=Payment.version + 1)
+        .returning(Payment, previous.c.status)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    row = (await session.execute(stmt)).one_or_none()
+    if row is None:
+        raise await _payment_access_error(
+            session, payment_id, "Not authorized to update this payment"
         )
-
-    # Store previous status for logging
-    prev_status = payment.status
-    payment.status = PaymentStatus(data.status.value)
+    payment, prev_status = row
 
     # Log the change
-    log = PaymentLog(
-        payment_id=payment.id,
-        performed_by=user.id,
-        prev_status=prev_status,
-        new_status=data.status,
-        amount=payment.amount,
-        note=f"Payment status updated to {data.status.value}",
-    )
-    session.add(log)
+    logs = [
+        {
+            "payment_id": payment.id,
+            "performed_by": user.id,
+            "prev_status": prev_status,
+            "new_status": new_status,
+            "amount": payment.amount,
+            "note": f"Payment status updated to {data.status.value}",
+        }
+    ]
+    await _flush_logs(session, logs)
 
     await session.commit()
-    await session.refresh(payment)
     return payment
 
 
 async def delete_payment(session: AsyncSession, payment_id: UUID, user: User) -> bool:
     """
-    Delete payment (only if it's in CREATED status).
+    Delete payment (only the sender and only if it's in CREATED status).
     """
-    # Start a transaction
-    stmt = select(Payment).where(Payment.id == payment_id).with_for_update()
-    result = await session.execute(stmt)
-    payment = result.scalar_one_or_none()
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
+    # Authorization and status check are part of the DELETE itself. Payment
+    # logs are removed by ON DELETE CASCADE.
+    stmt = (
+        delete(Payment)
+        .where(
+            Payment.id == payment_id,
+            Payment.sender_id == user.id,
+            Payment.status == PaymentStatus.CREATED,
         )
-
-    if payment.status != PaymentStatus.CREATED:
+        .returning(Payment.id)
+    )
+    deleted = await session.scalar(stmt)
+    if deleted is None:
+        stmt = select(Payment.sender_id).where(Payment.id == payment_id)
+        result = await session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
+            )
+        if row.sender_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to delete this payment",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete payment that is not in CREATED status",
         )
 
-    # Log the deletion
-    log = PaymentLog(
-        payment_id=payment.id,
-        performed_by=user.id,
-        prev_status=payment.status,
-        new_status=payment.status,  # Same status since we're deleting
-        amount=payment.amount,
-        note="Payment deleted",
-    )
-    session.add(log)
-
-    await session.delete(payment)
-
     await session.commit()
     return True
 
 
 async def get_payments_by_user_id(
-    session: AsyncSession, user_id: UUID, current_user: User
-) -> List[Payment]:
+    session: AsyncSession,
+    user_id: UUID,
+    current_user: User,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> tuple[List[Payment], Optional[str]]:
     """
     Get all payments for a given user ID.
     Only the user themselves or an admin can access this information.
@@ -246,16 +610,9 @@ async def get_payments_by_user_id(
         )
 
     # Get payments where the user is either the sender or recipient
-    stmt = (
-        select(Payment)
-        .where((Payment.sender_id == user_id) | (Payment.recipient_id == user_id))
-        .options(
-            selectinload(Payment.sender),
-            selectinload(Payment.recipient),
+    stmt = lambda_stmt(
+        lambda: select(Payment).where(
+            (Payment.sender_id == user_id) | (Payment.recipient_id == user_id)
         )
-        .order_by(Payment.created_at.desc())
     )
-
-    result = await session.execute(stmt)
-    payments = list(result.scalars().all())
-    return payments
+    return await _paginate(session, stmt, limit, cursor)
@@ -0,0 +1,47 @@
+"""
+Memoize FastAPI's inspection of dependency callables.
+
+FastAPI 0.116 calls is_coroutine_callable / is_gen_callable /
+is_async_gen_callable for every sub-dependency on every request, although the
+answer never changes for a given callable. The results are cached per callable
+in a WeakKeyDictionary, so overridden or discarded dependencies are not kept
+alive.
+"""
+
+from functools import wraps
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+import fastapi.dependencies.utils as dependency_utils
+
+_PATCHED = (
+    "is_coroutine_callable",
+    "is_gen_callable",
+    "is_async_gen_callable",
+)
+
+
+def _memoize(func: Callable[[Any], bool]) -> Callable[[Any], bool]:
+    cache: WeakKeyDictionary[Any, bool] = WeakKeyDictionary()
+
+    @wraps(func)
+    def wrapper(call: Any) -> bool:
+        try:
+            return cache[call]
+        except KeyError:
+            result = cache[call] = func(call)
+            return result
+        except TypeError:
+            # Callable cannot be weakly referenced, e.g. a builtin
+            return func(call)
+
+    wrapper.__memoized__ = True
+    return wrapper
+
+
+def install_dependency_inspection_cache() -> None:
+    """Patch fastapi.dependencies.utils, safe to call more than once."""
+    for name in _PATCHED:
+        func = getattr(dependency_utils, name)
+        if not getattr(func, "__memoized__", False):
+            setattr(dependency_utils, name, _memoize(func))
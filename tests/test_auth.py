@@ -58,3 +58,81 @@ async def test_login(client: AsyncClient):
     assert data["user"].get("username") == "testuser"
     assert data["user"].get("email") == "testuser@example.com"
     assert data["user"].get("id") == user_id
+
+
+async def test_registration_conflict(client: AsyncClient):
+    """Повторная регистрация с тем же email возвращает 409."""
+
+    payload = {
+        "username": "testuser",
+        "email": "testuser@example.com",
+        "password": "securepassword",
+        "password_repeat": "securepassword",
+    }
+    response = await client.post("/auth/register", json=payload)
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/auth/register",
+        json={**payload, "username": "anotheruser"},
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == {"email": "уже занята"}
+
+
+async def test_logout_revokes_tokens(client: AsyncClient, redis, register_and_login):
+    """С Redis логаут отзывает и access-токен, и refresh-токен."""
+    await register_and_login("alice")
+    response = await client.post(
+        "/auth/login",
+        json={"email": "alice@example.com", "password": "securepassword"},
+    )
+    tokens = response.json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert (await client.get("/users/me", headers=headers)).status_code == 200
+
+    response = await client.post(
+        "/auth/logout",
+        headers=headers,
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == 204, response.text
+
+    response = await client.get("/users/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+
+async def test_refresh_reuse_window(client: AsyncClient, redis, register_and_login):
+    """Повтор refresh в окне отдаёт только выданный access-токен."""
+    await register_and_login("alice")
+    response = await client.post(
+        "/auth/login",
+        json={"email": "alice@example.com", "password": "securepassword"},
+    )
+    old = response.json()["refresh_token"]
+
+    response = await client.post("/auth/refresh", json={"refresh_token": old})
+    assert response.status_code == 200, response.text
+    pair = response.json()
+
+    # Новый refresh-токен повторно не выдаётся, возвращается прежний
+    response = await client.post("/auth/refresh", json={"refresh_token": old})
+    assert response.status_code == 200, response.text
+    assert response.json()["access_token"] == pair["access_token"]
+    assert response.json()["refresh_token"] == old
+
+    # После логаута повтор больше не работает
+    response = await client.post(
+        "/auth/logout",
+        headers={"Authorization": f"Bearer {pair['access_token']}"},
+        json={"refresh_token": pair["refresh_token"]},
+    )
+    assert response.status_code == 204, response.text
+    response = await client.post("/auth/refresh", json={"refresh_token": old})
+    assert response.status_code == 401
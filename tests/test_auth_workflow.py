@@ -5,7 +5,6 @@ from httpx import AsyncClient
 pytestmark = pytest.mark.asyncio
 
 
-@pytest.mark.asyncio(loop_scope="class")
 @pytest.mark.order(1)  # Указываем порядок выполнения
 class TestAuthWorkflow:
     """Класс для тестирования полного цикла аутентификации."""
@@ -49,9 +48,11 @@ class TestAuthWorkflow:
         assert "access_token" in token_data
         assert "refresh_token" in token_data
 
-        # Сохраняем токены в общий словарь
+        # Сохраняем токены в общий словарь, access-токен дальше
+        # отправляется клиентом по умолчанию
         workflow_state["access_token"] = token_data["access_token"]
         workflow_state["refresh_token"] = token_data["refresh_token"]
+        class_client.headers["Authorization"] = f"Bearer {token_data['access_token']}"
 
     @pytest.mark.order(3)
     async def test_refresh_token(self, class_client: AsyncClient, workflow_state: dict):
@@ -59,12 +60,9 @@ class TestAuthWorkflow:
         assert "refresh_token" in workflow_state, "Refresh token not found in state"
         assert "access_token" in workflow_state, "Access token not found in state"
         refresh_token = workflow_state["refresh_token"]
-        access_token = workflow_state["access_token"]
 
-        headers = {"Authorization": f"Bearer {access_token}"}
         response = await class_client.post(
             "/auth/refresh",
-            headers=headers,
             json={
                 "refresh_token": refresh_token,
             },
@@ -80,6 +78,7 @@ class TestAuthWorkflow:
         # Обновляем токены в общем словаре
         workflow_state["access_token"] = token_data["access_token"]
         workflow_state["refresh_token"] = token_data["refresh_token"]
+        class_client.headers["Authorization"] = f"Bearer {token_data['access_token']}"
 
     @pytest.mark.order(4)
     async def test_get_self_profile(
@@ -87,11 +86,9 @@ class TestAuthWorkflow:
     ):
         """Тест 3: Проверка эндпоинта. Берем токен из фикстуры."""
         assert "access_token" in workflow_state, "Access token not found in state"
-        access_token = workflow_state["access_token"]
         user_data = workflow_state["user_data"]
 
-        headers = {"Authorization": f"Bearer {access_token}"}
-        response = await class_client.get("/users/me", headers=headers)
+        response = await class_client.get("/users/me")
 
         assert response.status_code == 200, response.text
         profile_data = response.json()
@@ -104,6 +101,21 @@ class TestAuthWorkflow:
     async def test_logout(self, class_client: AsyncClient, workflow_state: dict):
         """Тест 5: Логаут."""
 
-        response = await class_client.post("/auth/logout")
+        refresh_token = workflow_state["refresh_token"]
+        response = await class_client.post(
+            "/auth/logout", json={"refresh_token": refresh_token}
+        )
+
+        assert response.status_code == 204, response.text
 
+        # The refresh token is revoked by the logout
+        response = await class_client.post(
+            "/auth/refresh", json={"refresh_token": refresh_token}
+        )
+        assert response.status_code == 401, response.text
+
+        # A broken access token does not turn the logout into a 401
+        response = await class_client.post(
+            "/auth/logout", headers={"Authorization": "Bearer not-a-jwt"}
+        )
         assert response.status_code == 204, response.text
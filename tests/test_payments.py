@@ -0,0 +1,407 @@
+import base64
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import PaymentLog, PaymentStatus
+from app.services.payments import _COPY_THRESHOLD, _flush_logs
+
+# Помечаем все тесты в этом файле как асинхронные
+pytestmark = pytest.mark.asyncio
+
+
+async def create_payment(
+    client: AsyncClient, headers: dict, recipient_id: str, amount: str = "100.00"
+) -> dict:
+    response = await client.post(
+        "/payments/",
+        headers=headers,
+        json={
+            "recipient_id": recipient_id,
+            "card_last4": "1234",
+            "card_holder": "Иван Иванов",
+            "amount": amount,
+        },
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def get_balance(client: AsyncClient, headers: dict) -> str:
+    response = await client.get("/users/me", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["balance"]
+
+
+async def test_confirm_payment_moves_balance(client: AsyncClient, register_and_login):
+    """Подтверждение платежа переводит сумму от отправителя получателю."""
+    _, sender = await register_and_login("sender")
+    recipient_id, recipient = await register_and_login("recipient")
+
+    response = await client.post(
+        "/users/me/balance", headers=sender, json={"amount": 150}
+    )
+    assert response.status_code == 200, response.text
+
+    payment = await create_payment(client, sender, recipient_id)
+    assert payment["status"] == "created"
+
+    response = await client.post(f"/payments/{payment['id']}/confirm", headers=sender)
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "paid"
+
+    assert await get_balance(client, sender) == "50.00"
+    assert await get_balance(client, recipient) == "100.00"
+
+    # Завершённый платёж нельзя подтвердить или отменить повторно
+    response = await client.post(f"/payments/{payment['id']}/confirm", headers=sender)
+    assert response.status_code == 400
+    response = await client.post(f"/payments/{payment['id']}/cancel", headers=sender)
+    assert response.status_code == 400
+
+    response = await client.get(f"/payments/{payment['id']}/logs", headers=recipient)
+    assert response.status_code == 200, response.text
+    logs = response.json()
+    assert len(logs) == 1
+    assert logs[0]["prev_status"] == "created"
+    assert logs[0]["new_status"] == "paid"
+    assert logs[0]["amount"] == "100.00"
+
+    response = await client.get(
+        f"/payments/{payment['id']}/logs/stream", headers=sender
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == logs
+
+
+async def test_confirm_batch(client: AsyncClient, register_and_login):
+    """Пачка подтверждается целиком или не подтверждается совсем."""
+    _, sender = await register_and_login("sender")
+    recipient_id, recipient = await register_and_login("recipient")
+    await client.post("/users/me/balance", headers=sender, json={"amount": 150})
+
+    first = await create_payment(client, sender, recipient_id, amount="60.00")
+    second = await create_payment(client, sender, recipient_id, amount="50.00")
+    ids = [second["id"], first["id"]]
+
+    response = await client.post(
+        "/payments/confirm-batch", headers=sender, json={"payment_ids": ids}
+    )
+    assert response.status_code == 200, response.text
+    assert [p["id"] for p in response.json()] == ids
+    assert {p["status"] for p in response.json()} == {"paid"}
+    assert await get_balance(client, sender) == "40.00"
+    assert await get_balance(client, recipient) == "110.00"
+
+    response = await client.get(f"/payments/{first['id']}/logs", headers=sender)
+    assert [log["new_status"] for log in response.json()] == ["paid"]
+
+    # Вместе платежи не покрываются балансом: ничего не меняется
+    third = await create_payment(client, sender, recipient_id, amount="30.00")
+    fourth = await create_payment(client, sender, recipient_id, amount="20.00")
+    response = await client.post(
+        "/payments/confirm-batch",
+        headers=sender,
+        json={"payment_ids": [third["id"], fourth["id"]]},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient balance"
+    assert await get_balance(client, sender) == "40.00"
+    response = await client.get(f"/payments/{third['id']}", headers=sender)
+    assert response.json()["status"] == "created"
+
+    response = await client.post(
+        "/payments/confirm-batch",
+        headers=sender,
+        json={"payment_ids": [third["id"], first["id"]]},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Payment already finalized"
+
+    response = await client.post(
+        "/payments/confirm-batch",
+        headers=sender,
+        json={"payment_ids": [third["id"], str(uuid.uuid4())]},
+    )
+    assert response.status_code == 404
+
+    # Чужие платежи в пачке подтвердить нельзя
+    sender_id = (await client.get("/users/me", headers=sender)).json()["id"]
+    back = await create_payment(client, recipient, sender_id, amount="10.00")
+    response = await client.post(
+        "/payments/confirm-batch",
+        headers=sender,
+        json={"payment_ids": [third["id"], back["id"]]},
+    )
+    assert response.status_code == 403
+    response = await client.get(f"/payments/{back['id']}", headers=recipient)
+    assert response.json()["status"] == "created"
+
+    # Чужой платёж проверяется раньше статуса: 403, а не 400
+    response = await client.post(
+        "/payments/confirm-batch",
+        headers=sender,
+        json={"payment_ids": [third["id"], back["id"], first["id"]]},
+    )
+    assert response.status_code == 403
+    response = await client.get(f"/payments/{third['id']}", headers=sender)
+    assert response.json()["status"] == "created"
+
+    response = await client.post(
+        "/payments/confirm-batch", headers=sender, json={"payment_ids": []}
+    )
+    assert response.status_code == 422
+
+
+async def test_confirm_batch_checks_debits(client: AsyncClient, register_and_login):
+    """Поступление из той же пачки не оплачивает списание отправителя."""
+    sender_id, sender = await register_and_login("sender")
+    recipient_id, _ = await register_and_login("recipient")
+
+    to_self = await create_payment(client, sender, sender_id, amount="100.00")
+    to_recipient = await create_payment(client, sender, recipient_id, amount="100.00")
+    response = await client.post(
+        "/payments/confirm-batch",
+        headers=sender,
+        json={"payment_ids": [to_self["id"], to_recipient["id"]]},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient balance"
+    assert await get_balance(client, sender) == "0.00"
+
+
+async def test_confirm_payment_insufficient_balance(
+    client: AsyncClient, register_and_login
+):
+    _, sender = await register_and_login("sender")
+    recipient_id, _ = await register_and_login("recipient")
+
+    payment = await create_payment(client, sender, recipient_id)
+
+    response = await client.post(f"/payments/{payment['id']}/confirm", headers=sender)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient balance"
+
+    response = await client.get(f"/payments/{payment['id']}", headers=sender)
+    assert response.json()["status"] == "created"
+
+
+async def test_create_payment_unknown_recipient(
+    client: AsyncClient, register_and_login
+):
+    _, sender = await register_and_login("sender")
+
+    response = await client.post(
+        "/payments/",
+        headers=sender,
+        json={
+            "recipient_id": str(uuid.uuid4()),
+            "card_last4": "1234",
+            "card_holder": "Иван Иванов",
+            "amount": "10.00",
+        },
+    )
+    assert response.status_code == 404
+
+
+async def test_cancel_payment(client: AsyncClient, register_and_login):
+    _, sender = await register_and_login("sender")
+    recipient_id, _ = await register_and_login("recipient")
+
+    payment = await create_payment(client, sender, recipient_id)
+
+    response = await client.post(f"/payments/{payment['id']}/cancel", headers=sender)
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "canceled"
+
+    response = await client.post(f"/payments/{payment['id']}/confirm", headers=sender)
+    assert response.status_code == 400
+
+
+async def test_list_payments(client: AsyncClient, register_and_login):
+    sender_id, sender = await register_and_login("sender")
+    recipient_id, recipient = await register_and_login("recipient")
+
+    small = await create_payment(client, sender, recipient_id, amount="10.00")
+    big = await create_payment(client, sender, recipient_id, amount="500.00")
+    await client.post(f"/payments/{small['id']}/cancel", headers=sender)
+
+    response = await client.get("/payments/", headers=sender)
+    assert response.status_code == 200, response.text
+    assert {p["id"] for p in response.json()["items"]} == {small["id"], big["id"]}
+
+    response = await client.get("/payments/", headers=sender, params={"min_sum": "100"})
+    assert [p["id"] for p in response.json()["items"]] == [big["id"]]
+
+    for param in ("min_sum", "max_sum"):
+        response = await client.get("/payments/", headers=sender, params={param: "-1"})
+        assert response.status_code == 422, response.text
+
+    response = await client.get(
+        "/payments/", headers=sender, params={"status_filter": "canceled"}
+    )
+    assert [p["id"] for p in response.json()["items"]] == [small["id"]]
+
+    # Входящие платежи видны в истории получателя
+    response = await client.get(f"/payments/user/{recipient_id}", headers=recipient)
+    assert response.status_code == 200, response.text
+    assert {p["id"] for p in response.json()["items"]} == {small["id"], big["id"]}
+
+    response = await client.get(f"/payments/user/{sender_id}", headers=recipient)
+    assert response.status_code == 403
+
+
+async def test_list_payments_pagination(client: AsyncClient, register_and_login):
+    """Постраничная выдача по курсору: без пропусков и повторов."""
+    sender_id, sender = await register_and_login("sender")
+    recipient_id, _ = await register_and_login("recipient")
+
+    # В тестовой транзакции now() одинаковый: порядок внутри страницы задаёт id
+    created = {
+        (await create_payment(client, sender, recipient_id))["id"] for _ in range(5)
+    }
+
+    for url in ("/payments/", f"/payments/user/{sender_id}"):
+        seen = []
+        cursor = None
+        for _ in range(3):
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get(url, headers=sender, params=params)
+            assert response.status_code == 200, response.text
+            page = response.json()
+            assert len(page["items"]) <= 2
+            seen += [p["id"] for p in page["items"]]
+            cursor = page["next_cursor"]
+        assert cursor is None
+        assert len(seen) == len(set(seen)) == 5
+        assert set(seen) == created
+
+    naive = base64.urlsafe_b64encode(
+        f"2025-01-01T00:00:00|{uuid.uuid4().hex}".encode()
+    ).decode()
+    for cursor in ("not-a-cursor", naive):
+        response = await client.get(
+            "/payments/", headers=sender, params={"cursor": cursor}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+    response = await client.get("/payments/", headers=sender, params={"limit": 0})
+    assert response.status_code == 422
+
+
+async def test_payment_access_rights(client: AsyncClient, register_and_login):
+    """Платёж доступен только участникам, изменять его может только отправитель."""
+    _, sender = await register_and_login("sender")
+    recipient_id, recipient = await register_and_login("recipient")
+    _, stranger = await register_and_login("stranger")
+
+    payment = await create_payment(client, sender, recipient_id)
+    url = f"/payments/{payment['id']}"
+
+    response = await client.get(url, headers=recipient)
+    assert response.status_code == 200, response.text
+    assert response.json()["amount"] == "100.00"
+
+    response = await client.get(url, headers=stranger)
+    assert response.status_code == 403
+    response = await client.get(f"{url}/logs", headers=stranger)
+    assert response.status_code == 403
+    response = await client.get(f"{url}/logs/stream", headers=stranger)
+    assert response.status_code == 403
+    response = await client.put(url, headers=recipient, json={"status": "canceled"})
+    assert response.status_code == 403
+    response = await client.delete(url, headers=recipient)
+    assert response.status_code == 403
+
+    response = await client.get(f"/payments/{uuid.uuid4()}", headers=sender)
+    assert response.status_code == 404
+
+
+async def test_update_payment_status(client: AsyncClient, register_and_login):
+    _, sender = await register_and_login("sender")
+    recipient_id, _ = await register_and_login("recipient")
+
+    payment = await create_payment(client, sender, recipient_id)
+
+    response = await client.put(
+        f"/payments/{payment['id']}", headers=sender, json={"status": "canceled"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "canceled"
+
+    response = await client.get(f"/payments/{payment['id']}/logs", headers=sender)
+    assert [log["new_status"] for log in response.json()] == ["canceled"]
+    assert [log["prev_status"] for log in response.json()] == ["created"]
+
+
+async def test_delete_payment(client: AsyncClient, register_and_login):
+    _, sender = await register_and_login("sender")
+    recipient_id, _ = await register_and_login("recipient")
+
+    payment = await create_payment(client, sender, recipient_id)
+    canceled = await create_payment(client, sender, recipient_id)
+    await client.post(f"/payments/{canceled['id']}/cancel", headers=sender)
+
+    response = await client.delete(f"/payments/{payment['id']}", headers=sender)
+    assert response.status_code == 204, response.text
+
+    response = await client.get(f"/payments/{payment['id']}", headers=sender)
+    assert response.status_code == 404
+
+    # Удалить можно только платёж в статусе "created"
+    response = await client.delete(f"/payments/{canceled['id']}", headers=sender)
+    assert response.status_code == 400
+
+
+async def test_flush_logs_copy(
+    client: AsyncClient, session: AsyncSession, register_and_login
+):
+    """Большая пачка логов пишется через COPY и читается обратно без искажений."""
+    sender_id, sender = await register_and_login("sender")
+    recipient_id, _ = await register_and_login("recipient")
+    payment = await create_payment(client, sender, recipient_id)
+
+    rows = [
+        {
+            "payment_id": uuid.UUID(payment["id"]),
+            "performed_by": uuid.UUID(sender_id),
+            "prev_status": PaymentStatus.CREATED,
+            "new_status": PaymentStatus.CANCELED,
+            "amount": Decimal(i) + Decimal("0.25"),
+            "note": f"log {i}",
+        }
+        for i in range(_COPY_THRESHOLD)
+    ]
+    await _flush_logs(session, rows)
+
+    stmt = select(PaymentLog).where(PaymentLog.payment_id == payment["id"])
+    logs = (await session.scalars(stmt)).all()
+    assert len({log.id for log in logs}) == len(rows)
+    assert all(isinstance(log.id, uuid.UUID) for log in logs)
+    assert all(isinstance(log.amount, Decimal) for log in logs)
+    assert (
+        sorted(
+            (
+                {
+                    "payment_id": log.payment_id,
+                    "performed_by": log.performed_by,
+                    "prev_status": log.prev_status,
+                    "new_status": log.new_status,
+                    "amount": log.amount,
+                    "note": log.note,
+                }
+                for log in logs
+            ),
+            key=lambda row: row["amount"],
+        )
+        == rows
+    )
@@ -0,0 +1,121 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import user_auth_key, user_balance_key, user_me_key
+
+# Помечаем все тесты в этом файле как асинхронные
+pytestmark = pytest.mark.asyncio
+
+
+async def test_update_profile(client: AsyncClient, register_and_login):
+    """Профиль обновляется, чужой email занять нельзя."""
+    _, headers = await register_and_login("alice")
+    await register_and_login("bob")
+
+    response = await client.put(
+        "/users/me",
+        headers=headers,
+        json={"username": "alice2", "email": "alice2@example.com"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["username"] == "alice2"
+    assert response.json()["email"] == "alice2@example.com"
+
+    # Повторно указать свой же email можно
+    response = await client.put(
+        "/users/me", headers=headers, json={"email": "alice2@example.com"}
+    )
+    assert response.status_code == 200, response.text
+
+    response = await client.put(
+        "/users/me", headers=headers, json={"email": "bob@example.com"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+    # Вход по новому email
+    response = await client.post(
+        "/auth/login",
+        json={"email": "alice2@example.com", "password": "securepassword"},
+    )
+    assert response.status_code == 200, response.text
+
+
+async def test_balance(client: AsyncClient, register_and_login):
+    _, headers = await register_and_login("alice")
+
+    response = await client.get("/users/me/balance", headers=headers)
+    assert response.json() == {"balance": "0.00"}
+
+    response = await client.post(
+        "/users/me/balance", headers=headers, json={"amount": 12.5}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["balance"] == "12.50"
+
+    response = await client.get("/users/me/balance", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {"balance": "12.50"}
+
+    # Сумма пополнения положительная и не точнее копеек
+    for amount in (0, -5, "0.001"):
+        response = await client.post(
+            "/users/me/balance", headers=headers, json={"amount": amount}
+        )
+        assert response.status_code == 422
+
+
+async def test_user_cache(
+    client: AsyncClient, session: AsyncSession, redis, register_and_login
+):
+    """С Redis пользователь и ответы /users/me кэшируются до изменения строки."""
+    alice_id, alice = await register_and_login("alice")
+    bob_id, bob = await register_and_login("bob")
+
+    response = await client.get("/users/me/balance", headers=alice)
+    assert response.json() == {"balance": "0.00"}
+    assert user_balance_key(uuid.UUID(alice_id)) in redis.data
+
+    # Первый запрос кладёт пользователя в кэш, следующий берёт его оттуда.
+    # Новая сессия запроса, как в приложении: строки в ней ещё нет
+    response = await client.get("/payments/", headers=alice)
+    assert response.status_code == 200, response.text
+    assert user_auth_key(uuid.UUID(alice_id)) in redis.data
+    session.expunge_all()
+    response = await client.post(
+        "/users/me/balance", headers=alice, json={"amount": 12.5}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["balance"] == "12.50"
+    assert response.json()["username"] == "alice"
+    assert user_auth_key(uuid.UUID(alice_id)) not in redis.data
+
+    response = await client.get("/users/me/balance", headers=alice)
+    assert response.json() == {"balance": "12.50"}
+
+    # Подтверждение платежа сбрасывает кэш обоих участников
+    response = await client.get("/users/me", headers=bob)
+    assert response.json()["balance"] == "0.00"
+    assert user_me_key(uuid.UUID(bob_id)) in redis.data
+    response = await client.post(
+        "/payments/",
+        headers=alice,
+        json={
+            "recipient_id": bob_id,
+            "card_last4": "1234",
+            "card_holder": "Иван Иванов",
+            "amount": "10.00",
+        },
+    )
+    payment_id = response.json()["id"]
+    session.expunge_all()
+    response = await client.post(f"/payments/{payment_id}/confirm", headers=alice)
+    assert response.status_code == 200, response.text
+
+    response = await client.get("/users/me", headers=bob)
+    assert response.json()["balance"] == "10.00"
+    response = await client.get("/users/me/balance", headers=alice)
+    assert response.json() == {"balance": "2.50"}